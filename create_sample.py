@@ -1,8 +1,14 @@
 #!/usr/bin/env python3
 """
 Create a sample Excel file with postcodes for testing.
+
+Usage:
+    python create_sample.py [output_file]
+
+Pass a .parquet file name to create a Parquet file instead.
 """
 
+import sys
 import pandas as pd
 
 # Sample postcodes from various UK locations
@@ -36,7 +42,10 @@ df = pd.DataFrame({
     ]
 })
 
-# Save to Excel
-output_file = 'sample_postcodes.xlsx'
-df.to_excel(output_file, index=False)
+# Save to Excel (or Parquet)
+output_file = sys.argv[1] if len(sys.argv) > 1 else 'sample_postcodes.xlsx'
+if output_file.lower().endswith('.parquet'):
+    df.to_parquet(output_file, index=False, compression='zstd')
+else:
+    df.to_excel(output_file, index=False)
 print(f"Created {output_file} with {len(df)} sample postcodes")
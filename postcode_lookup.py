@@ -3,18 +3,134 @@
 Postcode to Council Ward Lookup Tool
 
 This script reads postcodes from an Excel file and looks up council ward information
-using the postcodes.io API. Results are saved to a new Excel file.
+using the postcodes.io API. Results are saved to a new Excel file. Parquet files
+(.parquet) are also supported for input and output.
 
 Usage:
     python postcode_lookup.py input.xlsx output.xlsx [--postcode-column COLUMN_NAME]
 """
 
 import argparse
+import asyncio
+import gc
+import importlib.util
+import math
+import os
+import sqlite3
 import sys
-from typing import List, Dict, Optional
+from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
+from typing import Iterable, List, Dict, Optional
+import orjson
 import pandas as pd
 import requests
-from time import sleep
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from time import perf_counter, sleep, time
+import xlsxwriter
+
+try:
+    import aiohttp
+except ImportError:
+    # Fallback for environments without aiohttp: batches are looked up one at a time
+    aiohttp = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    # Optional: only needed for Parquet input/output
+    pa = pq = None
+
+# python-calamine parses workbooks much faster than pandas' default openpyxl
+# engine (which already opens files read-only); pandas supports it from 2.2
+EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') else None
+
+# Output column name -> field in the postcodes.io result
+RESULT_FIELDS = {
+    'admin_ward': 'admin_ward',
+    'admin_district': 'admin_district',
+    'parliamentary_constituency': 'parliamentary_constituency',
+    'region': 'region',
+    'country': 'country',
+    'postcode_formatted': 'postcode',
+    'latitude': 'latitude',
+    'longitude': 'longitude'
+}
+_get_fields = itemgetter(*RESULT_FIELDS.values())
+
+CHUNK_SIZE = 10000  # Rows looked up and written out at a time
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'councilwards.sqlite')
+
+
+class ResultCache:
+    """Persistent SQLite cache of postcode lookup results."""
+
+    TTL = 30 * 24 * 60 * 60  # Cached results expire after 30 days
+    MAX_PARAMS = 500  # Stay well under SQLite's bound parameter limit
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: int = TTL):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Path to the SQLite database file
+            ttl: Age in seconds after which cached results are ignored
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS pc (k TEXT PRIMARY KEY, v BLOB, ts INTEGER)'
+        )
+        self.conn.commit()
+
+    def get_many(self, postcodes: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Fetch cached results for normalized postcodes.
+
+        Args:
+            postcodes: Normalized postcodes to look up
+
+        Returns:
+            Dictionary mapping each cached postcode to its data
+        """
+        postcodes = list(postcodes)
+        cutoff = int(time()) - self.ttl
+        found = {}
+
+        for i in range(0, len(postcodes), self.MAX_PARAMS):
+            chunk = postcodes[i:i + self.MAX_PARAMS]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f'SELECT k, v FROM pc WHERE ts >= ? AND k IN ({placeholders})',
+                [cutoff, *chunk]
+            )
+            for key, value in rows:
+                found[key] = orjson.loads(value)
+
+        return found
+
+    def put_many(self, results: Dict[str, Dict]) -> None:
+        """
+        Store results for normalized postcodes in a single transaction.
+
+        Args:
+            results: Dictionary mapping normalized postcodes to their data
+        """
+        now = int(time())
+        rows = [(pc, orjson.dumps(result), now) for pc, result in results.items()]
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO pc VALUES (?, ?, ?)', rows)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.conn.close()
 
 
 class PostcodeLookup:
@@ -22,22 +138,92 @@ class PostcodeLookup:
 
     BASE_URL = "https://api.postcodes.io"
     BATCH_SIZE = 100  # API allows up to 100 postcodes per batch request
-
-    def __init__(self, delay: float = 0.1):
+    MAX_CONCURRENCY = 10  # Batch requests in flight at once (async mode)
+    INITIAL_CONCURRENCY = 4  # Starting point for adaptive concurrency
+    BATCH_SIZES = (10, 20, 25, 50, 100)  # Sizes adaptive batching uses (all divide BATCH_SIZE)
+    LATENCY_RATIO = 2.0  # Back off when p95 latency exceeds this multiple of the baseline
+    BASELINE_WEIGHT = 0.2  # Weight of each new median in the moving-average baseline
+    TRIAL_COOLDOWN = 10  # Decisions to wait after a change that did not pay off
+    USER_AGENT = 'CouncilWards-Lookup/1.0'
+    MAX_RETRIES = 5  # Retries for failed or rate-limited requests
+    BACKOFF_FACTOR = 0.3  # Exponential backoff between retries, in seconds
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    SINGLE_CACHE_SIZE = 100000  # Single lookups remembered per instance
+
+    def __init__(
+        self,
+        delay: float = 0.1,
+        max_concurrency: int = MAX_CONCURRENCY,
+        cache_path: Optional[str] = DEFAULT_CACHE_PATH
+    ):
         """
         Initialize the PostcodeLookup.
 
         Args:
-            delay: Delay in seconds between API requests (to be respectful)
+            delay: Minimum wait in seconds before retrying a rate-limited request
+            max_concurrency: Maximum number of concurrent batch requests when
+                aiohttp is available (the actual number adapts to API latency)
+            cache_path: Path to the SQLite result cache, or None to disable caching
         """
         self.delay = delay
+        self.max_concurrency = max_concurrency
+        # Tuned from observed latencies while looking up (async mode only)
+        self._current_concurrency = min(self.INITIAL_CONCURRENCY, max_concurrency)
+        self._current_batch_size = self.BATCH_SIZE
+        self._baseline_latency = None  # Moving average of median batch latency
+        self._trial = None  # (batch size, concurrency, throughput) before a trial change
+        self._trial_cooldown = 0
+        # Created on first async lookup and kept until close(), so keep-alive
+        # connections are reused across lookup_all calls
+        self._loop = None
+        self._async_session = None
+        self.cache = ResultCache(cache_path) if cache_path else None
+        # Remember single lookups, so repeated calls skip the API
+        self._fetch = lru_cache(maxsize=self.SINGLE_CACHE_SIZE)(self._fetch_postcode)
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'CouncilWards-Lookup/1.0',
+            'User-Agent': self.USER_AGENT,
             'Content-Type': 'application/json'
         })
-
-    def normalize_postcode(self, postcode: str) -> str:
+        # Keep one reusable connection per concurrent worker, and retry
+        # transient failures on it with exponential backoff
+        retry = Retry(
+            total=self.MAX_RETRIES,
+            backoff_factor=self.BACKOFF_FACTOR,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=['GET', 'POST'],
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max_concurrency,
+            max_retries=retry
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self) -> None:
+        """Release the HTTP sessions and result cache."""
+        self.session.close()
+        if self._async_session is not None:
+            self._loop.run_until_complete(self._async_session.close())
+            self._async_session = None
+        if self._loop is not None:
+            self._loop.close()
+            self._loop = None
+        if self.cache:
+            self.cache.close()
+
+    def __enter__(self) -> 'PostcodeLookup':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @staticmethod
+    @lru_cache(maxsize=100000, typed=True)
+    def normalize_postcode(postcode: str) -> str:
         """Normalize postcode by removing spaces and converting to uppercase."""
         if pd.isna(postcode):
             return ""
@@ -47,6 +233,9 @@ class PostcodeLookup:
         """
         Look up a single postcode.
 
+        Results are cached per instance, so repeated lookups of the same
+        postcode only query the API once.
+
         Args:
             postcode: The postcode to look up
 
@@ -58,29 +247,39 @@ class PostcodeLookup:
             return None
 
         try:
-            response = self.session.get(
-                f"{self.BASE_URL}/postcodes/{normalized}",
-                timeout=10
-            )
+            return self._fetch(normalized)
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            print(f"Error looking up {postcode}: {e}")
+            return None
 
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 200 and data.get('result'):
-                    return data['result']
-            elif response.status_code == 404:
-                return None
-            else:
-                print(f"Warning: API returned status {response.status_code} for {postcode}")
-                return None
+    def _fetch_postcode(self, normalized: str) -> Optional[Dict]:
+        """
+        Fetch a single normalized postcode from the API.
 
-        except requests.exceptions.RequestException as e:
-            print(f"Error looking up {postcode}: {e}")
+        Raises on errors other than "not found", so that only definitive
+        answers end up in the lookup_single cache.
+        """
+        response = self.session.get(
+            f"{self.BASE_URL}/postcodes/{normalized}",
+            timeout=10
+        )
+        if response.status_code == 404:
             return None
+        response.raise_for_status()
+
+        data = orjson.loads(response.content)
+        if data.get('status') == 200 and data.get('result'):
+            return data['result']
+        return None
 
     def lookup_batch(self, postcodes: List[str]) -> Dict[str, Optional[Dict]]:
         """
         Look up multiple postcodes in a single API call.
 
+        Transient failures are retried with backoff by the session's adapter.
+        If the API is still rate limiting after that, waits for its Retry-After
+        period (at least delay seconds) and tries once more.
+
         Args:
             postcodes: List of postcodes to look up (max 100)
 
@@ -91,56 +290,336 @@ class PostcodeLookup:
             raise ValueError(f"Batch size cannot exceed {self.BATCH_SIZE}")
 
         # Normalize postcodes
-        normalized_map = {self.normalize_postcode(pc): pc for pc in postcodes}
+        normalized_map = self._group_by_normalized(postcodes)
         normalized_postcodes = [pc for pc in normalized_map.keys() if pc]
 
         if not normalized_postcodes:
             return {pc: None for pc in postcodes}
 
+        try:
+            response = self._post_batch(normalized_postcodes)
+            if response.status_code == 429:
+                sleep(max(self._retry_after(response.headers), self.delay))
+                response = self._post_batch(normalized_postcodes)
+
+            if response.status_code == 200:
+                return self._collect_results(normalized_map, orjson.loads(response.content))
+            print(f"Warning: Batch API returned status {response.status_code}")
+
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            print(f"Error in batch lookup: {e}")
+
+        return {pc: None for pc in postcodes}
+
+    def _post_batch(self, normalized_postcodes: List[str]) -> requests.Response:
+        """Send a batch lookup request for already normalized postcodes."""
+        return self.session.post(
+            f"{self.BASE_URL}/postcodes",
+            data=orjson.dumps({"postcodes": normalized_postcodes}),
+            timeout=30
+        )
+
+    def _group_by_normalized(self, postcodes: List[str]) -> Dict[str, List[str]]:
+        """Group postcodes by normalized form, keeping differently written duplicates."""
+        normalized_map = defaultdict(list)
+        for pc in postcodes:
+            normalized_map[self.normalize_postcode(pc)].append(pc)
+        return normalized_map
+
+    def _collect_results(
+        self,
+        normalized_map: Dict[str, List[str]],
+        data: Dict
+    ) -> Dict[str, Optional[Dict]]:
+        """Map a batch API response back onto the original postcodes."""
         results = {}
+        if data.get('status') == 200 and data.get('result'):
+            # The API echoes back each query as sent, i.e. already normalized
+            for item in data['result']:
+                result = item.get('result')
+                for original in normalized_map.get(item.get('query'), ()):
+                    results[original] = result
+        return results
+
+    async def _lookup_batch_async(
+        self,
+        session: 'aiohttp.ClientSession',
+        postcodes: List[str]
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        Look up a batch of postcodes without blocking the event loop.
+
+        Transient failures are retried with exponential backoff, honouring
+        any Retry-After header and waiting at least delay seconds after a
+        rate-limited (429) response.
+
+        Args:
+            session: Shared aiohttp session
+            postcodes: List of postcodes to look up (max 100)
+
+        Returns:
+            Dictionary mapping postcodes to their data
+        """
+        normalized_map = self._group_by_normalized(postcodes)
+        normalized_postcodes = [pc for pc in normalized_map.keys() if pc]
+
+        if not normalized_postcodes:
+            return {pc: None for pc in postcodes}
 
+        for attempt in range(self.MAX_RETRIES + 1):
+            wait = self.BACKOFF_FACTOR * 2 ** attempt
+            try:
+                async with session.post(
+                    f"{self.BASE_URL}/postcodes",
+                    data=orjson.dumps({"postcodes": normalized_postcodes}),
+                    timeout=aiohttp.ClientTimeout(total=30)
+                ) as response:
+                    if response.status == 200:
+                        data = orjson.loads(await response.read())
+                        return self._collect_results(normalized_map, data)
+                    message = f"Warning: Batch API returned status {response.status}"
+                    if response.status not in self.RETRY_STATUSES:
+                        break
+                    wait = max(wait, self._retry_after(response.headers))
+                    if response.status == 429:
+                        wait = max(wait, self.delay)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                message = f"Error in batch lookup: {e}"
+            except orjson.JSONDecodeError as e:
+                message = f"Error in batch lookup: {e}"
+                break
+
+            if attempt < self.MAX_RETRIES:
+                await asyncio.sleep(wait)
+
+        print(message)
+        return {pc: None for pc in postcodes}
+
+    @staticmethod
+    def _retry_after(headers) -> float:
+        """Seconds requested by a Retry-After header, or 0 if absent."""
         try:
-            response = self.session.post(
-                f"{self.BASE_URL}/postcodes",
-                json={"postcodes": normalized_postcodes},
-                timeout=30
+            return float(headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _get_async_session(self) -> 'aiohttp.ClientSession':
+        """
+        Return the shared aiohttp session, creating it on first use.
+
+        Must be called from a coroutine running on self._loop.
+        """
+        if self._async_session is None:
+            # Reuse keep-alive connections across batches instead of reconnecting
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                keepalive_timeout=30,
+                ttl_dns_cache=300
             )
+            self._async_session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    'User-Agent': self.USER_AGENT,
+                    'Content-Type': 'application/json'
+                }
+            )
+        return self._async_session
 
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 200 and data.get('result'):
-                    for item in data['result']:
-                        query = item.get('query', '').upper()
-                        original = normalized_map.get(query)
-                        if original:
-                            results[original] = item.get('result')
-            else:
-                print(f"Warning: Batch API returned status {response.status_code}")
-                # Fall back to individual lookups
-                for pc in postcodes:
-                    sleep(self.delay)
-                    results[pc] = self.lookup_single(pc)
+    async def _lookup_all_async(
+        self,
+        postcodes: List[str],
+        show_progress: bool = True
+    ) -> List[Optional[Dict]]:
+        """
+        Look up all postcodes, keeping several batches in flight at once.
 
-        except requests.exceptions.RequestException as e:
-            print(f"Error in batch lookup: {e}")
-            print("Falling back to individual lookups...")
-            for pc in postcodes:
-                sleep(self.delay)
-                results[pc] = self.lookup_single(pc)
+        A new batch is sent as soon as one finishes, so a slow batch does not
+        hold up the others. Latencies of finished batches are used to tune the
+        batch size and number of batches in flight as the lookup runs.
+
+        Args:
+            postcodes: List of all postcodes to look up
+            show_progress: Whether to show progress messages
+
+        Returns:
+            List of lookup results in the same order as postcodes
+        """
+        async def run(start, batch, generation):
+            began = perf_counter()
+            batch_results = await self._lookup_batch_async(session, batch)
+            latency = perf_counter() - began
+            return start, [batch_results.get(pc) for pc in batch], latency, generation
+
+        total = len(postcodes)
+        results = [None] * total
+        session = self._get_async_session()
+        pending = set()
+        position = 0
+        completed = 0
+        latencies = []
+        generation = 0  # Bumped whenever the batch size or concurrency changes
+
+        while position < total or pending:
+            # Top the window up to the current concurrency limit
+            while position < total and len(pending) < self._current_concurrency:
+                batch = postcodes[position:position + self._current_batch_size]
+                pending.add(asyncio.ensure_future(run(position, batch, generation)))
+                position += len(batch)
+
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                start, batch_results, latency, batch_generation = task.result()
+                results[start:start + len(batch_results)] = batch_results
+                completed += len(batch_results)
+                # Only full batches sent with the current settings say anything about them
+                if (batch_generation == generation
+                        and len(batch_results) == self._current_batch_size):
+                    latencies.append(latency)
+
+            if show_progress:
+                print(f"Processed {completed}/{total} postcodes "
+                      f"(batch size {self._current_batch_size}, "
+                      f"{self._current_concurrency} in parallel)")
+
+            if len(latencies) >= self._current_concurrency:
+                settings = (self._current_batch_size, self._current_concurrency)
+                self._adapt_concurrency(latencies)
+                latencies = []
+                if (self._current_batch_size, self._current_concurrency) != settings:
+                    generation += 1
 
         return results
 
+    def _adapt_concurrency(self, latencies: List[float]) -> None:
+        """
+        Tune batch size and concurrency from recent batch latencies.
+
+        Latency is judged against a moving-average baseline rather than an
+        absolute target, so a uniformly slow API or link is not mistaken for
+        overload, and the baseline follows lasting changes in either direction.
+        Slow or uneven batches first reduce concurrency, then try smaller
+        batches; healthy ones try more concurrency, then larger batches.
+        Every change except backing off is a trial, kept only if it raised
+        estimated throughput (postcodes in flight / mean latency). At least
+        BATCH_SIZE postcodes are always in flight, so throughput never falls
+        below one full batch at a time.
+
+        Args:
+            latencies: Time taken by full batches sent with the current
+                settings, in seconds
+        """
+        latencies = sorted(latencies)
+        median = latencies[len(latencies) // 2]
+        mean = sum(latencies) / len(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+        batch_size = self._current_batch_size
+        concurrency = self._current_concurrency
+        throughput = batch_size * concurrency / mean
+
+        if self._trial is not None:
+            trial_batch_size, trial_concurrency, trial_throughput = self._trial
+            self._trial = None
+            if throughput <= trial_throughput:
+                # The change did not pay off: go back, and wait a while before
+                # trying another
+                self._set_batching(trial_batch_size, trial_concurrency)
+                self._trial_cooldown = self.TRIAL_COOLDOWN
+                return
+
+        if self._baseline_latency is None:
+            self._baseline_latency = median
+        slow = p95 > self.LATENCY_RATIO * self._baseline_latency or mean > 2 * median
+        self._baseline_latency += self.BASELINE_WEIGHT * (median - self._baseline_latency)
+        if self._trial_cooldown:
+            self._trial_cooldown -= 1
+
+        index = self.BATCH_SIZES.index(batch_size)
+        if slow:
+            if (concurrency // 2) * batch_size >= self.BATCH_SIZE:
+                self._current_concurrency = concurrency // 2
+            elif index > 0 and not self._trial_cooldown:
+                # Smaller batches, with enough of them to keep as many
+                # postcodes in flight
+                smaller = self.BATCH_SIZES[index - 1]
+                needed = -(-batch_size * concurrency // smaller)
+                if needed <= self.max_concurrency:
+                    self._trial = (batch_size, concurrency, throughput)
+                    self._set_batching(smaller, needed)
+        elif self._trial_cooldown:
+            pass
+        elif concurrency < self.max_concurrency:
+            self._trial = (batch_size, concurrency, throughput)
+            self._current_concurrency = concurrency + 1
+        elif batch_size < self.BATCH_SIZE:
+            self._trial = (batch_size, concurrency, throughput)
+            self._set_batching(self.BATCH_SIZES[index + 1], concurrency)
+
+    def _set_batching(self, batch_size: int, concurrency: int) -> None:
+        """Switch batch size and concurrency, restarting the latency baseline."""
+        if batch_size != self._current_batch_size:
+            # Latencies at one batch size say little about another
+            self._baseline_latency = None
+        self._current_batch_size = batch_size
+        self._current_concurrency = concurrency
+
     def lookup_all(self, postcodes: List[str], show_progress: bool = True) -> List[Dict]:
         """
         Look up all postcodes with batch processing.
 
+        Cached results are reused; the remaining postcodes are sent in batches,
+        concurrently when aiohttp is installed, otherwise one at a time.
+
         Args:
             postcodes: List of all postcodes to look up
             show_progress: Whether to show progress messages
 
         Returns:
-            List of dictionaries with lookup results
+            List of dictionaries with lookup results, in the same order as postcodes
         """
+        if not self.cache:
+            return self._lookup_uncached(postcodes, show_progress)
+
+        normalized = [self.normalize_postcode(pc) for pc in postcodes]
+        cached = self.cache.get_many({pc for pc in normalized if pc})
+        if show_progress and cached:
+            print(f"Found {len(cached)} postcodes in cache")
+
+        misses = [pc for pc, norm in zip(postcodes, normalized) if norm not in cached]
+        fetched = iter(self._lookup_uncached(misses, show_progress))
+
+        results = []
+        new_results = {}
+        for norm in normalized:
+            if norm in cached:
+                results.append(cached[norm])
+            else:
+                result = next(fetched)
+                if result:
+                    new_results[norm] = result
+                results.append(result)
+
+        if new_results:
+            self.cache.put_many(new_results)
+
+        return results
+
+    def _lookup_uncached(
+        self,
+        postcodes: List[str],
+        show_progress: bool = True
+    ) -> List[Optional[Dict]]:
+        """Look up postcodes via the API, bypassing the cache."""
+        if aiohttp is not None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                if self._loop is None:
+                    self._loop = asyncio.new_event_loop()
+                return self._loop.run_until_complete(
+                    self._lookup_all_async(postcodes, show_progress)
+                )
+
         results = []
         total = len(postcodes)
 
@@ -154,108 +633,246 @@ class PostcodeLookup:
                 print(f"Processing batch {batch_num}/{total_batches} ({len(batch)} postcodes)...")
 
             batch_results = self.lookup_batch(batch)
-            results.extend(batch_results.values())
-
-            # Be respectful to the API
-            if i + self.BATCH_SIZE < total:
-                sleep(self.delay)
+            results.extend(batch_results.get(pc) for pc in batch)
 
         return results
 
 
-def extract_fields(result: Optional[Dict]) -> Dict[str, Optional[str]]:
+def extract_columns(results: List[Optional[Dict]]) -> Dict[str, List]:
     """
-    Extract relevant fields from API result.
+    Extract relevant fields from API results, one list per output column.
 
     Args:
-        result: API result dictionary
+        results: API result dictionaries (None where the lookup failed)
 
     Returns:
-        Dictionary with extracted fields
+        Dictionary mapping output column names to lists of values
     """
-    if not result:
-        return {
-            'admin_ward': None,
-            'admin_district': None,
-            'parliamentary_constituency': None,
-            'region': None,
-            'country': None,
-            'postcode_formatted': None,
-            'latitude': None,
-            'longitude': None
-        }
-
-    return {
-        'admin_ward': result.get('admin_ward'),
-        'admin_district': result.get('admin_district'),
-        'parliamentary_constituency': result.get('parliamentary_constituency'),
-        'region': result.get('region'),
-        'country': result.get('country'),
-        'postcode_formatted': result.get('postcode'),
-        'latitude': result.get('latitude'),
-        'longitude': result.get('longitude')
-    }
+    columns = [[None] * len(results) for _ in RESULT_FIELDS]
+    for i, result in enumerate(results):
+        if result:
+            try:
+                values = _get_fields(result)
+            except KeyError:
+                values = [result.get(field) for field in RESULT_FIELDS.values()]
+            for column, value in zip(columns, values):
+                column[i] = value
+    return dict(zip(RESULT_FIELDS, columns))
+
+
+class ExcelRowWriter:
+    """
+    Stream DataFrame chunks into a single Excel worksheet, one row at a time.
+
+    Uses xlsxwriter's constant_memory mode so only the current row is held in
+    memory. pandas' to_excel writes column by column, which that mode cannot
+    handle, so rows are written directly.
+    """
+
+    MAX_ROWS = 1048576  # Excel's worksheet row limit, including the header
+
+    def __init__(self, output_file: str, columns: List[str]):
+        """
+        Create the workbook and write the header row.
+
+        Args:
+            output_file: Path to output Excel file
+            columns: Column names for the header row
+        """
+        self.workbook = xlsxwriter.Workbook(output_file, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+        })
+        self.worksheet = self.workbook.add_worksheet()
+        header_format = self.workbook.add_format({'bold': True, 'border': 1})
+        self.worksheet.write_row(0, 0, [str(column) for column in columns], header_format)
+        self.row = 1
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append the rows of a DataFrame below those already written."""
+        # xlsxwriter silently ignores rows past the limit, so check first
+        if self.row + len(df) > self.MAX_ROWS:
+            raise ValueError(
+                f"This sheet is too large! Excel allows at most {self.MAX_ROWS} rows; "
+                "use a .parquet output file instead."
+            )
+        for values in df.itertuples(index=False, name=None):
+            self.worksheet.write_row(self.row, 0, [self._cell_value(v) for v in values])
+            self.row += 1
+
+    @staticmethod
+    def _cell_value(value):
+        """Convert values xlsxwriter cannot write: blanks for missing, text for +/-inf."""
+        if pd.isna(value):
+            return None
+        # Match pandas' to_excel (inf_rep='inf'), which writes infinities as text
+        if value == math.inf:
+            return 'inf'
+        if value == -math.inf:
+            return '-inf'
+        return value
+
+    def close(self) -> None:
+        """Finish writing the workbook."""
+        self.workbook.close()
+
+    def __enter__(self) -> 'ExcelRowWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ParquetChunkWriter:
+    """Stream DataFrame chunks into a single Parquet file."""
+
+    NUMERIC_FIELDS = ('latitude', 'longitude')
+
+    def __init__(self, output_file: str, df: pd.DataFrame):
+        """
+        Open the Parquet file with a schema fixed up front.
+
+        Args:
+            output_file: Path to output Parquet file
+            df: Input DataFrame, used to derive the types of the original columns
+        """
+        # Fix the schema from the whole input rather than the first chunk, so
+        # a column that happens to be empty in one chunk keeps its type
+        schema = pa.Schema.from_pandas(df, preserve_index=False).remove_metadata()
+        for column in RESULT_FIELDS:
+            field_type = pa.float64() if column in self.NUMERIC_FIELDS else pa.string()
+            field = pa.field(column, field_type)
+            if column in schema.names:
+                # Lookup results replace an input column of the same name
+                schema = schema.set(schema.get_field_index(column), field)
+            else:
+                schema = schema.append(field)
+        self.schema = schema
+        self.writer = pq.ParquetWriter(output_file, schema, compression='zstd')
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append the rows of a DataFrame to the file."""
+        table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self) -> None:
+        """Finish writing the file."""
+        self.writer.close()
+
+    def __enter__(self) -> 'ParquetChunkWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def is_parquet(path: str) -> bool:
+    """Whether a file should be read or written as Parquet, based on its name."""
+    return path.lower().endswith('.parquet')
 
 
 def process_excel(
     input_file: str,
     output_file: str,
     postcode_column: str = 'postcode',
-    delay: float = 0.1
+    delay: float = 0.1,
+    cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+    chunk_size: int = CHUNK_SIZE
 ) -> None:
     """
-    Process an Excel file and add council ward information.
+    Process an Excel (or Parquet) file and add council ward information.
+
+    Rows are looked up and written out chunk_size at a time, so memory use
+    beyond the input sheet stays bounded by the chunk size (plus one result
+    per distinct postcode).
 
     Args:
-        input_file: Path to input Excel file
-        output_file: Path to output Excel file
+        input_file: Path to input Excel or .parquet file
+        output_file: Path to output Excel or .parquet file
         postcode_column: Name of the column containing postcodes
-        delay: Delay between API requests in seconds
+        delay: Minimum wait in seconds before retrying a rate-limited request
+        cache_path: Path to the SQLite result cache, or None to disable caching
+        chunk_size: Number of rows to process at a time
     """
-    print(f"Reading Excel file: {input_file}")
+    if pa is None and (is_parquet(input_file) or is_parquet(output_file)):
+        print("Error: Parquet files require pyarrow (pip install pyarrow).")
+        sys.exit(1)
+
+    print(f"Reading input file: {input_file}")
 
     try:
-        df = pd.read_excel(input_file)
+        if is_parquet(input_file):
+            df = pd.read_parquet(input_file)
+        else:
+            df = pd.read_excel(input_file, engine=EXCEL_ENGINE)
     except FileNotFoundError:
         print(f"Error: File '{input_file}' not found.")
         sys.exit(1)
     except Exception as e:
-        print(f"Error reading Excel file: {e}")
+        print(f"Error reading input file: {e}")
         sys.exit(1)
 
     # Check if postcode column exists
     if postcode_column not in df.columns:
-        print(f"Error: Column '{postcode_column}' not found in Excel file.")
+        print(f"Error: Column '{postcode_column}' not found in input file.")
         print(f"Available columns: {', '.join(df.columns)}")
         sys.exit(1)
 
     print(f"Found {len(df)} rows with postcodes")
 
-    # Initialize lookup service
-    lookup = PostcodeLookup(delay=delay)
-
-    # Get postcodes
-    postcodes = df[postcode_column].tolist()
-
-    # Perform lookups
-    print("\nLooking up postcodes...")
-    results = lookup.lookup_all(postcodes, show_progress=True)
-
-    # Extract fields and add to dataframe
-    print("\nProcessing results...")
-    extracted = [extract_fields(r) for r in results]
-    result_df = pd.DataFrame(extracted)
-
-    # Combine with original data
-    output_df = pd.concat([df, result_df], axis=1)
-
-    # Count successful lookups
-    successful = sum(1 for r in results if r is not None)
-    print(f"\nSuccessfully looked up {successful}/{len(postcodes)} postcodes")
+    # Results for every distinct postcode seen so far, so postcodes repeated
+    # across chunks are only looked up once
+    result_map = {}
+    successful = 0
+
+    if is_parquet(output_file):
+        writer = ParquetChunkWriter(output_file, df)
+    elif len(df) + 1 > ExcelRowWriter.MAX_ROWS:
+        print(f"Error: {len(df)} rows do not fit in an Excel sheet "
+              f"(at most {ExcelRowWriter.MAX_ROWS - 1} plus the header).")
+        print("Use a .parquet output file instead.")
+        sys.exit(1)
+    else:
+        new_columns = [column for column in RESULT_FIELDS if column not in df.columns]
+        writer = ExcelRowWriter(output_file, [*df.columns, *new_columns])
 
-    # Save to Excel
     print(f"Saving results to: {output_file}")
-    output_df.to_excel(output_file, index=False)
+    with writer, PostcodeLookup(delay=delay, cache_path=cache_path) as lookup:
+        for start in range(0, len(df), chunk_size):
+            chunk = df.iloc[start:start + chunk_size]
+            print(f"\nLooking up rows {start + 1}-{start + len(chunk)} of {len(df)}...")
+
+            # Normalize the whole column at once (same rules as normalize_postcode)
+            # and look up only the distinct postcodes not seen in earlier chunks
+            normalized = (
+                chunk[postcode_column]
+                .astype('string')
+                .str.replace(' ', '', regex=False)
+                .str.strip()
+                .str.upper()
+                .fillna('')
+                .tolist()
+            )
+            unique = [pc for pc in dict.fromkeys(normalized) if pc not in result_map]
+            print(f"Found {len(unique)} new unique postcodes")
+
+            if unique:
+                result_map.update(zip(unique, lookup.lookup_all(unique, show_progress=True)))
+            results = [result_map[pc] for pc in normalized]
+            successful += sum(1 for r in results if r is not None)
+
+            # Add the extracted fields to the original data and write out.
+            # Building the frame from the existing columns with copy=False
+            # shares their data; assign would deep-copy the chunk unless
+            # copy-on-write is enabled (the default only from pandas 3)
+            output = pd.DataFrame({**dict(chunk.items()), **extract_columns(results)}, copy=False)
+            writer.write(output)
+
+            # Release this chunk before starting the next one
+            del chunk, normalized, unique, results, output
+            gc.collect()
+
+    print(f"\nSuccessfully looked up {successful}/{len(df)} postcodes")
     print("Done!")
 
 
@@ -266,11 +883,11 @@ def main():
     )
     parser.add_argument(
         'input_file',
-        help='Input Excel file containing postcodes'
+        help='Input Excel (or .parquet) file containing postcodes'
     )
     parser.add_argument(
         'output_file',
-        help='Output Excel file to save results'
+        help='Output Excel (or .parquet) file to save results'
     )
     parser.add_argument(
         '--postcode-column',
@@ -281,7 +898,23 @@ def main():
         '--delay',
         type=float,
         default=0.1,
-        help='Delay between API requests in seconds (default: 0.1)'
+        help='Minimum wait in seconds before retrying a rate-limited request (default: 0.1)'
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=CHUNK_SIZE,
+        help=f'Number of rows to process at a time (default: {CHUNK_SIZE})'
+    )
+    parser.add_argument(
+        '--cache',
+        default=DEFAULT_CACHE_PATH,
+        help=f'Path to the lookup result cache (default: {DEFAULT_CACHE_PATH})'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always query the API instead of using cached results'
     )
 
     args = parser.parse_args()
@@ -290,7 +923,9 @@ def main():
         args.input_file,
         args.output_file,
         args.postcode_column,
-        args.delay
+        args.delay,
+        None if args.no_cache else args.cache,
+        args.chunk_size
     )
 
 